@@ -4,7 +4,9 @@ import argparse
 import io
 import logging
 import os
-from typing import Dict, Iterable, List, Optional, Set
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 import pandas as pd
 
@@ -23,35 +25,47 @@ from importers.ingestion_engine import (
 )
 from importers.local_importer import archive_last_month, process_local_files
 from processors.alipay_processor import parse_alipay_csv, process_alipay
+from processors.encoding_utils import candidate_encodings
 from processors.wechat_processor import process_wechat
 from ynabbridge.ynab_client import YNABClient
 
 logger = logging.getLogger(__name__)
 
 
+_PLATFORM_RE = re.compile(r'(alipay|支付宝)|(wechat|微信)', re.IGNORECASE)
+
+
 def detect_platform(filename: str) -> str:
     """Detect payment platform from filename."""
-    fname = filename.lower()
-    if 'alipay' in fname or '支付宝' in fname:
-        return 'alipay'
-    if 'wechat' in fname or '微信' in fname:
-        return 'wechat'
-    return 'unknown'
+    match = _PLATFORM_RE.search(filename)
+    if not match:
+        return 'unknown'
+    return 'alipay' if match.group(1) else 'wechat'
+
+
+_ALIPAY_OWNER_MARKER = '支付宝账户'
 
 
 def _extract_alipay_owner(content: bytes) -> Optional[str]:
-    """Extract owner identifier from Alipay CSV header if present."""
-    encodings = ['utf-8', 'gbk', 'gb18030']
-    for enc in encodings:
+    """Extract owner identifier from Alipay CSV header if present.
+
+    Searches the raw bytes for the marker instead of decoding the whole file;
+    the marker lives in the metadata header, so only the first 8 KiB matter.
+    """
+    for enc in ('utf-8', 'gbk', 'gb18030'):
+        marker = _ALIPAY_OWNER_MARKER.encode(enc)
+        idx = content.find(marker, 0, 8192)
+        if idx == -1:
+            continue
+        line_end = content.find(b'\n', idx)
+        if line_end == -1:
+            line_end = len(content)
         try:
-            text = content.decode(enc)
+            tail = content[idx + len(marker):line_end].decode(enc)
         except UnicodeDecodeError:
             continue
-        for line in text.splitlines():
-            if '支付宝账户' in line:
-                _, _, tail = line.partition('支付宝账户')
-                tail = tail.lstrip('：:').strip()
-                return tail or None
+        tail = tail.lstrip('：:').strip()
+        return tail or None
     return None
 
 
@@ -101,8 +115,7 @@ def process_transaction_file(filename: str, content: bytes) -> Optional[pd.DataF
                 logger.error("Failed to read WeChat Excel %s: %s", filename, exc)
                 return None
         else:
-            encodings = ['utf-8', 'gbk', 'gb2312', 'gb18030']
-            for encoding in encodings:
+            for encoding in candidate_encodings(content):
                 try:
                     content_str = content.decode(encoding)
                     df = pd.read_csv(io.StringIO(content_str))
@@ -122,8 +135,7 @@ def process_transaction_file(filename: str, content: bytes) -> Optional[pd.DataF
     # Fallback for generic CSV/Excel, but block Alipay files by header check
     lower_name = filename.lower()
     if lower_name.endswith('.csv'):
-        encodings = ['utf-8', 'gbk', 'gb2312', 'gb18030']
-        for encoding in encodings:
+        for encoding in candidate_encodings(content):
             try:
                 content_str = content.decode(encoding)
                 if '支付宝交易记录明细' in content_str or '支付宝' in content_str[:100]:
@@ -149,6 +161,22 @@ def process_transaction_file(filename: str, content: bytes) -> Optional[pd.DataF
     return df
 
 
+_PARSE_WORKERS = 8
+
+
+def _parse_files_concurrently(entries: List[Tuple[str, bytes]]) -> List[Optional[pd.DataFrame]]:
+    """Parse several exports at once, preserving input order.
+
+    Parsing is a mix of decode work and pandas C code that releases the GIL,
+    so a small thread pool overlaps files nicely without pickling DataFrames
+    across processes.
+    """
+    if len(entries) <= 1:
+        return [process_transaction_file(name, content) for name, content in entries]
+    with ThreadPoolExecutor(max_workers=min(_PARSE_WORKERS, len(entries))) as executor:
+        return list(executor.map(lambda entry: process_transaction_file(*entry), entries))
+
+
 def _match_budget_identifier(budgets: List[dict], identifier: str) -> Optional[str]:
     """Return budget ID matching provided ID or name."""
     if not identifier:
@@ -183,10 +211,10 @@ def _handle_local_inputs(
     )
     items: List[IngestionItem] = []
     processed_paths: Set[str] = set()
-    for idx, (identifier, content) in enumerate(files):
+    parsed = _parse_files_concurrently([(str(identifier), content) for identifier, content in files])
+    for idx, ((identifier, content), df) in enumerate(zip(files, parsed)):
         display_name = str(identifier)
         logger.debug("Processing file: %s", display_name)
-        df = process_transaction_file(display_name, content)
         fallback_label = os.path.basename(display_name) if isinstance(identifier, str) else 'local-source'
         if df is None or df.empty:
             logger.debug("No transactions parsed from %s", display_name)
@@ -221,12 +249,15 @@ def _handle_local_inputs(
 
     result = engine.flush()
     if result.all_succeeded:
+        renamed = 0
         for path in processed_paths:
             try:
-                os.rename(path, f"{path}.done")
-                logger.info("Renamed %s to mark as processed.", path)
-            except Exception as exc:
+                os.replace(path, f"{path}.done")
+                renamed += 1
+            except OSError as exc:
                 logger.warning("Failed to rename %s: %s", path, exc)
+        if renamed:
+            logger.info("Renamed %d file(s) to mark as processed.", renamed)
         archive_last_month(list(paths))
     else:
         logger.warning("One or more uploads failed; source files left untouched for retry.")
@@ -313,9 +344,11 @@ def _process_email_flow(
 
     callbacks = SourceCallbacks(on_success=_on_success)
     items: List[IngestionItem] = []
-    for idx, attachment in enumerate(result.attachments):
+    parsed = _parse_files_concurrently(
+        [(attachment.filename, attachment.content) for attachment in result.attachments]
+    )
+    for idx, (attachment, df) in enumerate(zip(result.attachments, parsed)):
         fallback_label = attachment.sender or attachment.filename
-        df = process_transaction_file(attachment.filename, attachment.content)
         metadata = {'message_uids': {attachment.message_uid}}
         if df is None or df.empty:
             logger.debug("Parse failure for %s", attachment.filename)
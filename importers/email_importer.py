@@ -58,6 +58,25 @@ TENPAY_LINK_PATTERN = re.compile(
     re.IGNORECASE,
 )
 TENPAY_TIMEOUT = 30
+# Cheap raw-bytes probe for the From header so non-matching mail can be
+# discarded without building the full MIME tree first
+_RE_FROM_HEADER = re.compile(rb'^From:[ \t]*(.+)$', re.MULTILINE | re.IGNORECASE)
+_HEADER_PEEK_ITEM = 'BODY.PEEK[HEADER.FIELDS (FROM)]'
+# Servers echo the fetched item without the PEEK modifier
+_HEADER_PEEK_KEY = b'BODY[HEADER.FIELDS (FROM)]'
+
+
+def _from_header_mismatch(raw: bytes, sender: str) -> bool:
+    """True when the raw From header clearly names a different address.
+
+    Only trusts the probe when the matched line contains an address; folded
+    or encoded headers return False so callers fall back to a full parse.
+    """
+    match = _RE_FROM_HEADER.search(raw)
+    if match is None:
+        return False
+    from_line = match.group(1).lower()
+    return b'@' in from_line and sender.encode('utf-8', 'ignore') not in from_line
 
 
 @dataclass
@@ -83,17 +102,23 @@ class EmailStateStore:
     def __init__(self, path: Path = STATE_FILE):
         self.path = Path(path)
         self._data: Dict[str, Dict] = {}
+        # Per-mailbox set view over the persisted UID lists, built lazily so
+        # membership checks are O(1) instead of scanning the JSON-backed list
+        self._uid_sets: Dict[str, Set[str]] = {}
         self._dirty = False
         self._load()
 
     def _load(self) -> None:
-        if self.path.exists():
-            try:
-                with self.path.open('r', encoding='utf-8') as handle:
-                    self._data = json.load(handle)
-            except Exception as exc:
-                LOGGER.warning("Failed to load email state (%s); starting fresh.", exc)
-                self._data = {}
+        # Open directly; a missing file is the normal first-run case, so
+        # skip the separate exists() stat and let the open tell us
+        try:
+            with self.path.open('r', encoding='utf-8') as handle:
+                self._data = json.load(handle)
+        except FileNotFoundError:
+            self._data = {}
+        except Exception as exc:
+            LOGGER.warning("Failed to load email state (%s); starting fresh.", exc)
+            self._data = {}
         self._data.setdefault('mailboxes', {})
         # Remove legacy sender_budget mappings; owner_budget replaces them.
         legacy = self._data.pop('sender_budget', None)
@@ -108,24 +133,33 @@ class EmailStateStore:
         self.path.parent.mkdir(parents=True, exist_ok=True)
         tmp_path = self.path.with_suffix('.tmp')
         with tmp_path.open('w', encoding='utf-8') as handle:
-            json.dump(self._data, handle, ensure_ascii=False, indent=2)
+            # Compact separators: the state file is machine-read only, and
+            # skipping pretty-printing makes large mailbox states noticeably
+            # cheaper to encode and smaller on disk
+            json.dump(self._data, handle, ensure_ascii=False, separators=(',', ':'))
         os.replace(tmp_path, self.path)
         self._dirty = False
 
+    def _uids_for(self, mailbox_key: str) -> Set[str]:
+        cached = self._uid_sets.get(mailbox_key)
+        if cached is None:
+            mailbox = self._data['mailboxes'].get(mailbox_key, {})
+            cached = set(mailbox.get('processed_uids', []))
+            self._uid_sets[mailbox_key] = cached
+        return cached
+
     def get_processed_uids(self, mailbox_key: str) -> Set[str]:
-        mailbox = self._data['mailboxes'].get(mailbox_key, {})
-        return set(mailbox.get('processed_uids', []))
+        return set(self._uids_for(mailbox_key))
 
     def add_processed_uids(self, mailbox_key: str, uids: Iterable[str]) -> None:
+        known = self._uids_for(mailbox_key)
+        new_uids = [uid for uid in uids if uid not in known]
+        if not new_uids:
+            return
         mailbox = self._data['mailboxes'].setdefault(mailbox_key, {})
-        stored = mailbox.setdefault('processed_uids', [])
-        updated = False
-        for uid in uids:
-            if uid not in stored:
-                stored.append(uid)
-                updated = True
-        if updated:
-            self._dirty = True
+        mailbox.setdefault('processed_uids', []).extend(new_uids)
+        known.update(new_uids)
+        self._dirty = True
 
     def get_owner_budget(self, owner: str) -> Optional[str]:
         if not owner:
@@ -164,7 +198,10 @@ class EmailStateStore:
         return dict(self._data.get('account_mappings', {}))
 
     def replace_account_mappings(self, new_mappings: Dict[str, str]) -> None:
-        self._data['account_mappings'] = dict(new_mappings)
+        new_mappings = dict(new_mappings)
+        if self._data.get('account_mappings') == new_mappings:
+            return
+        self._data['account_mappings'] = new_mappings
         self._dirty = True
 
 
@@ -429,6 +466,10 @@ def _extract_tenpay_links(message: Message) -> List[str]:
             text = payload.decode(charset, errors='replace')
         except (LookupError, UnicodeDecodeError):
             text = payload.decode('utf-8', errors='replace')
+        # Cheap substring probe first; the regex only runs on the rare
+        # bodies that actually mention the Tenpay download host
+        if 'tenpay.wechatpay.cn' not in text.lower():
+            continue
         found = TENPAY_LINK_PATTERN.findall(text)
         for raw in found:
             clean = raw.strip(" '\"\t\r\n,><)")
@@ -494,6 +535,15 @@ def download_attachments(
     warnings: List[str] = []
     downloaded_links: Set[str] = set()
 
+    # One-off conversion so the per-sender skip check is an int set probe
+    # instead of a str() allocation per UID on every run
+    processed_int: Set[int] = set()
+    for known in processed_uids:
+        try:
+            processed_int.add(int(known))
+        except (TypeError, ValueError):
+            continue
+
     unique_senders = [s for s in {s.lower() for s in senders} if s]
     LOGGER.info("Email ingestion searching %d allowed senders in mailbox %s.", len(unique_senders), mailbox_key)
     if not unique_senders:
@@ -502,13 +552,16 @@ def download_attachments(
 
     for sender in unique_senders:
         search_value = _quote_imap_value(sender)
+        # Build each criteria list once per sender rather than per search call
+        from_criteria = ['FROM', search_value]
+        header_criteria = ['HEADER', 'FROM', search_value]
         try:
             # IMAPClient search uses uppercase keys
-            message_ids = mail.search(['FROM', search_value])
+            message_ids = mail.search(from_criteria)
             LOGGER.debug("Sender %s returned %d message(s).", sender, len(message_ids))
             if not message_ids and header_search_fallback:
                 LOGGER.debug("Sender %s had no matches with FROM; retrying HEADER search.", sender)
-                message_ids = mail.search(['HEADER', 'FROM', search_value])
+                message_ids = mail.search(header_criteria)
                 if message_ids:
                     LOGGER.debug(
                         "Sender %s matched %d message(s) via HEADER FROM fallback.",
@@ -522,17 +575,51 @@ def download_attachments(
             warnings.append(f"search-failed:{sender}")
             continue
 
-        for uid in message_ids:
-            uid_str = str(uid)
-            if uid_str in processed_uids:
-                LOGGER.debug("Skipping UID %s for sender %s (already processed).", uid_str, sender)
-                continue
-            try:
-                fetch_data = mail.fetch([uid], ['RFC822', 'FLAGS', 'ENVELOPE'])
-            except Exception as exc:
-                LOGGER.error("Failed to fetch message %s: %s", uid_str, exc)
-                warnings.append(f"fetch-failed:{uid_str}")
+        to_fetch = [uid for uid in message_ids if int(uid) not in processed_int]
+        if len(to_fetch) != len(message_ids):
+            LOGGER.debug(
+                "Skipping %d already-processed UID(s) for sender %s.",
+                len(message_ids) - len(to_fetch),
+                sender,
+            )
+        if not to_fetch:
+            continue
+
+        # Phase one: peek only the From headers so large attachment-laden
+        # messages from other senders never cross the wire in full
+        matched = to_fetch
+        try:
+            header_data = mail.fetch(to_fetch, [_HEADER_PEEK_ITEM, 'ENVELOPE'])
+        except Exception:
+            LOGGER.debug(
+                "Header peek failed for sender %s; fetching full bodies.", sender, exc_info=True
+            )
+            header_data = None
+        if header_data is not None:
+            matched = []
+            for uid in to_fetch:
+                header_blob = header_data.get(uid, {}).get(_HEADER_PEEK_KEY)
+                if header_blob and _from_header_mismatch(header_blob, sender):
+                    LOGGER.debug("Skipping UID %s after header peek (different sender).", uid)
+                    skipped.add(str(uid))
+                    continue
+                matched.append(uid)
+            if not matched:
                 continue
+
+        try:
+            # One FETCH round trip for the whole UID batch instead of one per message
+            fetch_data = mail.fetch(matched, ['RFC822', 'FLAGS', 'ENVELOPE'])
+        except Exception as exc:
+            LOGGER.error(
+                "Failed to fetch %d message(s) for sender %s: %s", len(matched), sender, exc
+            )
+            warnings.extend(f"fetch-failed:{uid}" for uid in matched)
+            continue
+
+        seen_batch: List[int] = []
+        for uid in matched:
+            uid_str = str(uid)
             msg_blob = fetch_data.get(uid, {}).get(b'RFC822')
             msg_warnings: List[str] = []
             if not msg_blob:
@@ -540,6 +627,12 @@ def download_attachments(
                 skipped.add(uid_str)
                 LOGGER.warning("Message %s issues: %s", uid_str, "; ".join(msg_warnings))
                 continue
+            if _from_header_mismatch(msg_blob[:4096], sender):
+                LOGGER.debug(
+                    "Skipping UID %s: From header does not match sender %s.", uid_str, sender
+                )
+                skipped.add(uid_str)
+                continue
             message: Message = email.message_from_bytes(msg_blob)
             subject = _decode_header(message.get('subject', ''))
             sender_addr = _extract_email(message.get('from', '')).lower() or sender
@@ -621,16 +714,25 @@ def download_attachments(
 
             if extracted_any:
                 processed.add(uid_str)
-                try:
-                    mail.add_flags(uid, [b'\\Seen'])
-                except Exception:
-                    LOGGER.debug("Unable to mark message %s as seen.", uid_str, exc_info=True)
+                seen_batch.append(uid)
             else:
                 skipped.add(uid_str)
 
             if msg_warnings:
                 LOGGER.warning("Message %s issues: %s", uid_str, "; ".join(msg_warnings))
 
+        if seen_batch:
+            try:
+                # imapclient accepts a UID sequence, so flag the batch in one call
+                mail.add_flags(seen_batch, [b'\\Seen'])
+            except Exception:
+                LOGGER.debug(
+                    "Unable to mark %d message(s) as seen for sender %s.",
+                    len(seen_batch),
+                    sender,
+                    exc_info=True,
+                )
+
     return EmailFetchResult(attachments, processed, skipped, warnings)
 
 
@@ -655,8 +757,6 @@ def _decode_header(header_value: str) -> str:
 
 
 def _extract_email(header_value: str) -> str:
-    import re
-
     if not header_value:
         return ""
     match = re.search(r'<([^>]+)>', header_value)
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import logging
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import Callable, Dict, Iterable, List, Optional, Protocol, Sequence, Set, Tuple
 
 import pandas as pd
 
-from ynabbridge.account_mapping import get_or_create_mapping
+from ynabbridge.account_mapping import flush_mappings, resolve_account_mappings
 from ynabbridge.formatter import convert_to_ynab_format
 
 LOGGER = logging.getLogger(__name__)
@@ -42,6 +45,38 @@ class SourceCallbacks:
     on_failure: Optional[Callable[[IngestionItem, str], None]] = None
 
 
+@dataclass(slots=True)
+class OwnerSummary:
+    """Per-owner aggregation shown in the end-of-run summary.
+
+    Slotted to keep per-owner state compact; ``__getitem__`` keeps the
+    dict-style access used by summary consumers working.
+    """
+
+    label: str
+    sources: Set[str] = field(default_factory=set)
+    messages: Set[str] = field(default_factory=set)
+    parsed: int = 0
+    prepared: int = 0
+    uploaded: int = 0
+    skipped: int = 0
+    warnings: List[str] = field(default_factory=list)
+
+    def __getitem__(self, key: str) -> object:
+        return getattr(self, key)
+
+
+@dataclass(slots=True)
+class OwnerBatch:
+    """Frames accumulated for one owner, formatted in bulk at flush time."""
+
+    label: str
+    budget_id: str
+    frames: List[pd.DataFrame] = field(default_factory=list)
+    name_map: Dict[str, str] = field(default_factory=dict)
+    transactions: List[dict] = field(default_factory=list)
+
+
 @dataclass
 class IngestionResult:
     """Result of running uploads through the shared engine."""
@@ -104,8 +139,9 @@ class IngestionEngine:
 
         self._owner_budget_cache: Dict[str, str] = {}
         self._budget_accounts_cache: Dict[str, List[dict]] = {}
-        self._owner_summary: Dict[str, Dict[str, object]] = {}
-        self._owner_batches: Dict[str, Dict[str, object]] = {}
+        self._account_name_cache: Dict[Tuple[str, str], Optional[str]] = {}
+        self._owner_summary: Dict[str, OwnerSummary] = {}
+        self._owner_batches: Dict[str, OwnerBatch] = {}
         self._owner_item_map: Dict[str, Set[str]] = {}
         self._item_owner_map: Dict[str, Set[str]] = {}
         self._item_registry: Dict[str, IngestionItem] = {}
@@ -133,42 +169,60 @@ class IngestionEngine:
     ) -> None:
         """Record a warning for a source that could not be parsed/processed."""
         owner_key = _owner_cache_key(label) or label
-        entry = self._owner_summary.setdefault(owner_key, _init_owner_summary_entry(label))
-        entry['label'] = label
-        entry['sources'].add(display_name)
+        entry = self._owner_summary.setdefault(owner_key, OwnerSummary(label))
+        entry.label = label
+        entry.sources.add(display_name)
         if metadata:
             for uid in metadata.get('message_uids', set()) or []:
-                entry['messages'].add(uid)
-        entry['skipped'] += 1
-        entry['warnings'].append(warning)
+                entry.messages.add(uid)
+        entry.skipped += 1
+        entry.warnings.append(warning)
 
     def flush(self) -> IngestionResult:
         """Upload prepared transactions and trigger callbacks."""
         if self._flushed:
             return self._result or IngestionResult([], [])
 
-        successful_owner_keys: Set[str] = set()
+        # Owners sharing a budget are coalesced into a single upload; independent
+        # budgets are uploaded concurrently since each is one blocking HTTPS call.
+        budget_transactions: Dict[str, List[dict]] = defaultdict(list)
+        budget_owner_keys: Dict[str, List[str]] = defaultdict(list)
         for owner_key, batch in self._owner_batches.items():
-            transactions = batch['transactions']
             entry = self._owner_summary[owner_key]
+            transactions = self._format_owner_batch(owner_key, batch, entry)
             if not transactions:
-                entry['warnings'].append("No transactions prepared for upload.")
                 continue
-            budget_id = batch['budget_id']
+            budget_id = batch.budget_id
             LOGGER.info(
                 "Uploading %d transactions for owner %s to budget %s.",
                 len(transactions),
-                batch['label'],
+                batch.label,
                 budget_id,
             )
-            success = self.ynab_client.upload_transactions(transactions, budget_id)
-            if success:
-                entry['uploaded'] += len(transactions)
-                successful_owner_keys.add(owner_key)
-            else:
-                entry['warnings'].append("YNAB upload failed.")
-                for item_id in self._owner_item_map.get(owner_key, set()):
-                    self._item_failures[item_id] = "YNAB upload failed."
+            budget_transactions[budget_id].extend(transactions)
+            budget_owner_keys[budget_id].append(owner_key)
+
+        successful_owner_keys: Set[str] = set()
+        budget_results: Dict[str, bool] = {}
+        if budget_transactions:
+            with ThreadPoolExecutor(max_workers=min(4, len(budget_transactions))) as executor:
+                futures = {
+                    budget_id: executor.submit(self.ynab_client.upload_transactions, transactions, budget_id)
+                    for budget_id, transactions in budget_transactions.items()
+                }
+                for budget_id, future in futures.items():
+                    budget_results[budget_id] = future.result()
+
+        for budget_id, success in budget_results.items():
+            for owner_key in budget_owner_keys[budget_id]:
+                entry = self._owner_summary[owner_key]
+                if success:
+                    entry.uploaded += len(self._owner_batches[owner_key].transactions)
+                    successful_owner_keys.add(owner_key)
+                else:
+                    entry.warnings.append("YNAB upload failed.")
+                    for item_id in self._owner_item_map.get(owner_key, set()):
+                        self._item_failures[item_id] = "YNAB upload failed."
 
         successful_items: List[IngestionItem] = []
         failed_items: List[Tuple[IngestionItem, str]] = []
@@ -194,16 +248,47 @@ class IngestionEngine:
             if callbacks and callbacks.on_failure:
                 callbacks.on_failure(item, reason)
 
+        # Mapping mutations are write-behind; persist them once per run here
+        if self.state_store is not None and hasattr(self.state_store, 'save'):
+            self.state_store.save()
+        flush_mappings()
+
         self._flushed = True
         self._result = IngestionResult(successful_items, failed_items)
         return self._result
 
+    def _format_owner_batch(
+            self,
+            owner_key: str,
+            batch: OwnerBatch,
+            entry: OwnerSummary,
+    ) -> List[dict]:
+        """Concatenate an owner's frames and format them in one pass."""
+        if batch.frames:
+            merged = batch.frames[0] if len(batch.frames) == 1 else pd.concat(
+                batch.frames, ignore_index=True
+            )
+            batch.frames.clear()
+            batch.transactions = convert_to_ynab_format(
+                merged,
+                self.default_account_id,
+                batch.name_map if batch.name_map else None,
+            )
+            entry.prepared += len(batch.transactions)
+        if not batch.transactions:
+            warning = "No transactions prepared for upload."
+            entry.warnings.append(warning)
+            entry.skipped += 1
+            for item_id in self._owner_item_map.get(owner_key, set()):
+                self._item_failures[item_id] = warning
+        return batch.transactions
+
     @property
     def has_items(self) -> bool:
         return bool(self._item_registry)
 
     @property
-    def summary(self) -> Dict[str, Dict[str, object]]:
+    def summary(self) -> Dict[str, OwnerSummary]:
         return self._owner_summary
 
     def print_summary(self, title: str) -> None:
@@ -211,22 +296,22 @@ class IngestionEngine:
 
     def _process_item(self, item: IngestionItem) -> None:
         owner_groups = _group_df_by_owner(item.dataframe, item.fallback_owner)
-        prepared_batches: List[Tuple[str, str, str, List[dict]]] = []
+        prepared_batches: List[Tuple[str, str, str, pd.DataFrame, Dict[str, str]]] = []
 
         for owner_label, owner_df in owner_groups:
             owner_key = _owner_cache_key(owner_label) or owner_label
-            entry = self._owner_summary.setdefault(owner_key, _init_owner_summary_entry(owner_label))
-            entry['label'] = owner_label
-            entry['sources'].add(item.display_name)
+            entry = self._owner_summary.setdefault(owner_key, OwnerSummary(owner_label))
+            entry.label = owner_label
+            entry.sources.add(item.display_name)
             for uid in item.metadata.get('message_uids', set()) or []:
-                entry['messages'].add(uid)
-            entry['parsed'] += 1
+                entry.messages.add(uid)
+            entry.parsed += 1
 
             budget_id = self._resolve_budget_for_owner(owner_label)
             if not budget_id:
                 warning = f"Missing budget mapping for {item.display_name}"
-                entry['warnings'].append(warning)
-                entry['skipped'] += 1
+                entry.warnings.append(warning)
+                entry.skipped += 1
                 self._item_failures[item.item_id] = warning
                 return
 
@@ -236,12 +321,14 @@ class IngestionEngine:
                     f"No YNAB accounts available for budget {budget_id}. "
                     "Set YNAB_ACCOUNT_ID or create an account."
                 )
-                entry['warnings'].append(warning)
-                entry['skipped'] += 1
+                entry.warnings.append(warning)
+                entry.skipped += 1
                 self._item_failures[item.item_id] = warning
                 return
 
-            name_map = _build_account_mapping(owner_df, budget_id, accounts, self.state_store)
+            name_map = _build_account_mapping(
+                owner_df, budget_id, accounts, self.state_store, self._account_name_cache
+            )
             if 'account_name' in owner_df.columns:
                 missing_names = [
                     nm for nm in {str(n).strip() for n in owner_df['account_name'].dropna().unique()}
@@ -249,32 +336,22 @@ class IngestionEngine:
                 ]
                 if missing_names:
                     warning = f"Missing account mapping for {', '.join(missing_names)}"
-                    entry['warnings'].append(warning)
-                    entry['skipped'] += 1
+                    entry.warnings.append(warning)
+                    entry.skipped += 1
                     self._item_failures[item.item_id] = warning
                     return
 
-            transactions = convert_to_ynab_format(
-                owner_df,
-                self.default_account_id,
-                name_map if name_map else None,
-            )
-            if not transactions:
-                warning = f"No transactions ready after formatting: {item.display_name}"
-                entry['warnings'].append(warning)
-                entry['skipped'] += 1
-                self._item_failures[item.item_id] = warning
-                return
-
-            prepared_batches.append((owner_key, owner_label, budget_id, transactions))
+            prepared_batches.append((owner_key, owner_label, budget_id, owner_df, name_map))
 
-        for owner_key, owner_label, budget_id, transactions in prepared_batches:
+        for owner_key, owner_label, budget_id, owner_df, name_map in prepared_batches:
             batch = self._owner_batches.setdefault(
                 owner_key,
-                {'label': owner_label, 'budget_id': budget_id, 'transactions': []},
+                OwnerBatch(owner_label, budget_id),
             )
-            batch['transactions'].extend(transactions)
-            self._owner_summary[owner_key]['prepared'] += len(transactions)
+            # Formatting is deferred to flush() so each owner pays one
+            # concat + convert_to_ynab_format call instead of one per item.
+            batch.frames.append(owner_df)
+            batch.name_map.update(name_map)
             self._owner_item_map.setdefault(owner_key, set()).add(item.item_id)
             self._item_owner_map.setdefault(item.item_id, set()).add(owner_key)
 
@@ -306,17 +383,25 @@ class IngestionEngine:
         return selected
 
 
+_NULL_LABELS = frozenset(('', 'nan', 'none', 'null'))
+
+
 def _clean_owner_label(value: object) -> str:
     if value is None:
         return ''
-    text = str(value).strip()
-    if not text or text.lower() in {'nan', 'none', 'null'}:
+    if isinstance(value, str):
+        # Fast path: most labels arrive already trimmed.
+        text = value if value == value.strip() else value.strip()
+    else:
+        text = str(value).strip()
+    if text.lower() in _NULL_LABELS:
         return ''
     return text
 
 
 def _owner_cache_key(owner_label: str) -> str:
-    return _clean_owner_label(owner_label).lower()
+    # Interned so repeated owners share one key object across the caches.
+    return sys.intern(_clean_owner_label(owner_label).lower())
 
 
 def _group_df_by_owner(df: pd.DataFrame, fallback_label: str) -> List[Tuple[str, pd.DataFrame]]:
@@ -351,51 +436,47 @@ def _build_account_mapping(
         budget_id: str,
         accounts: Sequence[dict],
         state_store: Optional[OwnerBudgetStore],
+        cache: Optional[Dict[Tuple[str, str], Optional[str]]] = None,
 ) -> Dict[str, str]:
-    """Prompt for account mapping per unique `account_name`."""
+    """Prompt for account mapping per unique `account_name`.
+
+    `cache` memoizes resolutions per (budget_id, name) for the run, so
+    payment methods shared across files/owners are only looked up once.
+    """
     mapping: Dict[str, str] = {}
     if not accounts or 'account_name' not in df.columns:
         return mapping
     unique_names = sorted(
         {str(name).strip() for name in df['account_name'].dropna().unique() if str(name).strip()}
     )
+    pending: List[str] = []
     for name in unique_names:
-        mapped_id = get_or_create_mapping(budget_id, name, accounts, store=state_store)
-        if mapped_id:
-            mapping[name.strip().lower()] = mapped_id
+        cache_key = (budget_id, name.lower())
+        if cache is not None and cache_key in cache:
+            mapped_id = cache[cache_key]
+            if mapped_id:
+                mapping[name.lower()] = mapped_id
+        else:
+            pending.append(name)
+    if pending:
+        resolved = resolve_account_mappings(budget_id, pending, accounts, store=state_store)
+        for name, mapped_id in resolved.items():
+            if cache is not None:
+                cache[(budget_id, name.lower())] = mapped_id
+            if mapped_id:
+                mapping[name.lower()] = mapped_id
     return mapping
 
 
-def _init_owner_summary_entry(label: str) -> Dict[str, object]:
-    return {
-        'label': label,
-        'sources': set(),
-        'messages': set(),
-        'parsed': 0,
-        'prepared': 0,
-        'uploaded': 0,
-        'skipped': 0,
-        'warnings': [],
-    }
-
-
-def _print_owner_summary(summary: Dict[str, Dict[str, object]], title: str) -> None:
+def _print_owner_summary(summary: Dict[str, OwnerSummary], title: str) -> None:
     if not summary:
         LOGGER.info("%s finished with no work to report.", title)
         return
     print(f"\n{title}")
     for data in summary.values():
-        label = data.get('label')
-        attachments = len(data.get('sources', set()))
-        parsed = data.get('parsed', 0)
-        prepared = data.get('prepared', 0)
-        uploaded = data.get('uploaded', 0)
-        skipped = data.get('skipped', 0)
         print(
-            f"- {label}: files={attachments}, parsed={parsed}, prepared={prepared}, "
-            f"uploaded={uploaded}, skipped={skipped}"
+            f"- {data.label}: files={len(data.sources)}, parsed={data.parsed}, prepared={data.prepared}, "
+            f"uploaded={data.uploaded}, skipped={data.skipped}"
         )
-        warnings = data.get('warnings', [])
-        if warnings:
-            for warn in warnings:
-                print(f"    ! {warn}")
+        for warn in data.warnings:
+            print(f"    ! {warn}")
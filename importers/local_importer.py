@@ -15,6 +15,9 @@ from importers.zip_utils import (
 
 LOGGER = logging.getLogger(__name__)
 
+# Payloads that are already compressed gain nothing from deflate
+_STORED_EXTENSIONS = {'.xlsx', '.xlsb', '.zip', '.gz', '.7z', '.pdf'}
+
 LOCAL_PASSPHRASE_TEMPLATES = [
     "LOCAL_ARCHIVE_PASSPHRASE_{identifier}",
     "LOCAL_ARCHIVE_PASSPHRASE",
@@ -166,17 +169,36 @@ def archive_last_month(dirs: List[str]) -> None:
     """
     if not dirs:
         return
-    # Compute last month range
+    # Compute last month range as raw timestamps so membership is a pair of
+    # float compares against the stat each DirEntry already carries
     today = datetime.now().date().replace(day=1)
     last_month_end = today - timedelta(days=1)
     last_month_start = last_month_end.replace(day=1)
+    lo_ts = datetime.combine(last_month_start, datetime.min.time()).timestamp()
+    hi_ts = datetime.combine(today, datetime.min.time()).timestamp()
 
-    def is_last_month(path: str) -> bool:
+    def _iter_last_month_files(base: str) -> Iterable[str]:
+        """Yield last-month files beneath `base` using scandir's cached stats."""
         try:
-            mtime = datetime.fromtimestamp(os.path.getmtime(path)).date()
-            return last_month_start <= mtime <= last_month_end
-        except Exception:
-            return False
+            entries = os.scandir(base)
+        except OSError as exc:
+            LOGGER.debug("Cannot scan %s: %s", base, exc)
+            return
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from _iter_last_month_files(entry.path)
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    if _is_skipped_file(entry.path):
+                        continue
+                    mtime = entry.stat(follow_symlinks=False).st_mtime
+                except OSError:
+                    continue
+                if lo_ts <= mtime < hi_ts:
+                    yield entry.path
 
     # Normalize directories (only keep directories)
     norm_dirs = []
@@ -189,15 +211,10 @@ def archive_last_month(dirs: List[str]) -> None:
 
     for base_dir in norm_dirs:
         # Collect files to archive relative to base_dir
-        files_to_archive = []
-        for root, _, files in os.walk(base_dir):
-            for fname in files:
-                fpath = os.path.join(root, fname)
-                if _is_skipped_file(fpath):
-                    continue
-                if is_last_month(fpath):
-                    rel = os.path.relpath(fpath, base_dir)
-                    files_to_archive.append((fpath, rel))
+        files_to_archive = [
+            (fpath, os.path.relpath(fpath, base_dir))
+            for fpath in _iter_last_month_files(base_dir)
+        ]
         if not files_to_archive:
             continue
         archive_name = f"{last_month_start.strftime('%Y-%m')}.archive.zip"
@@ -205,7 +222,12 @@ def archive_last_month(dirs: List[str]) -> None:
         try:
             with zipfile.ZipFile(archive_path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
                 for fpath, rel in files_to_archive:
-                    zf.write(fpath, arcname=rel)
+                    # Store already-compressed payloads as-is; deflate the rest
+                    # at the fastest level since this is a housekeeping archive
+                    if os.path.splitext(rel)[1].lower() in _STORED_EXTENSIONS:
+                        zf.write(fpath, arcname=rel, compress_type=zipfile.ZIP_STORED)
+                    else:
+                        zf.write(fpath, arcname=rel, compress_type=zipfile.ZIP_DEFLATED, compresslevel=1)
             logging.info(f"Archived {len(files_to_archive)} file(s) from {base_dir} into {archive_path}")
         except Exception as e:
             logging.error(f"Failed to create archive {archive_path}: {e}")
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import hashlib
 import logging
 import os
 import random
 import zlib
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
 
@@ -46,22 +48,32 @@ _COMMON_PASSPHRASES: Tuple[str, ...] = ('123456', '000000', '036383')
 _MAX_BRUTEFORCE_ATTEMPTS = int(os.getenv('ZIP_MAX_BRUTEFORCE_ATTEMPTS', '200'))
 
 
+# LCG parameters for enumerating the 6-digit space: multiplier - 1 is a
+# multiple of 20, which together with an increment coprime to 10^6 gives a
+# full-period orbit (Hull–Dobell theorem)
+_LCG_MODULUS = 1_000_000
+_LCG_MULTIPLIER = 48_821
+
+
 def _generate_all_six_digit_random_generator():
     """
     Generate all unique six-digit numbers (000000 to 999999) in random order.
-    True memory-efficient generator using virtual shuffling.
+
+    Uses a full-period linear congruential generator, so every value is
+    produced exactly once with O(1) state instead of shuffling a
+    million-entry list up front. Seed and increment are randomized per
+    generator so successive runs walk the space in different orders.
 
     Yields:
         int: Six-digit numbers in random order (may include leading zeros)
     """
-    n = 1_000_000  # Total count of 6-digit numbers
-    remaining = list(range(n))  # Indices only
-
-    for i in range(n):
-        # Pick random index from remaining
-        j = random.randint(i, n - 1)
-        remaining[i], remaining[j] = remaining[j], remaining[i]
-        yield remaining[i]
+    value = random.randrange(_LCG_MODULUS)
+    increment = random.randrange(_LCG_MODULUS)
+    while increment % 2 == 0 or increment % 5 == 0:
+        increment = random.randrange(_LCG_MODULUS)
+    for _ in range(_LCG_MODULUS):
+        yield value
+        value = (value * _LCG_MULTIPLIER + increment) % _LCG_MODULUS
 
 
 def sanitize_identifier(identifier: str) -> str:
@@ -138,6 +150,106 @@ def next_six_digit_candidate(identifier: str) -> Optional[str]:
         return f"{num:06d}"
 
 
+# WinZip AES members carry their parameters in extra field 0x9901 and store
+# a salt plus a 2-byte password verifier ahead of the ciphertext
+_WZ_AES_EXTRA_ID = 0x9901
+_WZ_AES_KDF_ITERATIONS = 1000
+
+
+def _load_wz_aes_verifier(zf: pyzipper.AESZipFile, info) -> Optional[Tuple[bytes, bytes, int]]:
+    """Return (salt, verifier, key_len) for a WinZip AES member, if parseable.
+
+    Lets brute-force candidates be rejected with a single PBKDF2 derivation
+    instead of a full open-and-decrypt round trip per attempt.
+    """
+    # pyzipper rewrites compress_type to the real method when parsing, so the
+    # presence of the 0x9901 extra field is the reliable WZ_AES marker
+    extra = getattr(info, 'extra', b'') or b''
+    strength = None
+    offset = 0
+    while offset + 4 <= len(extra):
+        header_id = int.from_bytes(extra[offset:offset + 2], 'little')
+        size = int.from_bytes(extra[offset + 2:offset + 4], 'little')
+        if header_id == _WZ_AES_EXTRA_ID and size >= 5:
+            strength = extra[offset + 8]
+            break
+        offset += 4 + size
+    if strength not in (1, 2, 3):
+        return None
+    salt_len = 4 + 4 * strength
+    key_len = 8 + 8 * strength
+    fp = zf.fp
+    try:
+        pos = fp.tell()
+        fp.seek(info.header_offset)
+        header = fp.read(30)
+        if len(header) != 30 or not header.startswith(b'PK\x03\x04'):
+            return None
+        name_len = int.from_bytes(header[26:28], 'little')
+        extra_len = int.from_bytes(header[28:30], 'little')
+        fp.seek(info.header_offset + 30 + name_len + extra_len)
+        blob = fp.read(salt_len + 2)
+    except (OSError, ValueError):
+        return None
+    finally:
+        try:
+            fp.seek(pos)
+        except (OSError, ValueError, UnboundLocalError):
+            pass
+    if len(blob) != salt_len + 2:
+        return None
+    return blob[:salt_len], blob[salt_len:], key_len
+
+
+# Candidates verified per parallel batch during brute force; PBKDF2 is
+# CPU-bound but hashlib releases the GIL, so threads scale with cores
+# without the pickling cost a process pool would add
+_VERIFY_BATCH_SIZE = 64
+_VERIFY_POOL: Optional[ThreadPoolExecutor] = None
+
+
+def _verify_pool() -> ThreadPoolExecutor:
+    global _VERIFY_POOL
+    if _VERIFY_POOL is None:
+        _VERIFY_POOL = ThreadPoolExecutor(
+            max_workers=min(8, os.cpu_count() or 1),
+            thread_name_prefix='zip-verify',
+        )
+    return _VERIFY_POOL
+
+
+def _find_matching_candidate(
+        salt: bytes,
+        verifier: bytes,
+        key_len: int,
+        candidates: List[str],
+) -> Optional[str]:
+    """Return the first candidate whose derived verifier matches, if any."""
+    if len(candidates) == 1:
+        passphrase = candidates[0]
+        return passphrase if _wz_aes_candidate_matches(salt, verifier, key_len, passphrase) else None
+    results = _verify_pool().map(
+        lambda candidate: _wz_aes_candidate_matches(salt, verifier, key_len, candidate),
+        candidates,
+    )
+    for candidate, matched in zip(candidates, results):
+        if matched:
+            return candidate
+    return None
+
+
+def _wz_aes_candidate_matches(salt: bytes, verifier: bytes, key_len: int, passphrase: str) -> bool:
+    """Check a candidate against the stored WinZip AES password verifier.
+
+    The verifier is the last 2 bytes of the PBKDF2-derived material; a false
+    positive (1 in 65536) is harmless because the full decrypt still fails.
+    """
+    derived = hashlib.pbkdf2_hmac(
+        'sha1', passphrase.encode('utf-8'), salt, _WZ_AES_KDF_ITERATIONS, 2 * key_len + 2
+    )
+    return derived[-2:] == verifier
+
+
 def _read_encrypted_member(
         zf: pyzipper.AESZipFile,
         info,
@@ -149,6 +261,8 @@ def _read_encrypted_member(
         label: str,
 ) -> Optional[bytes]:
     attempts = 0
+    wz_params: Optional[Tuple[bytes, bytes, int]] = None
+    wz_params_loaded = False
     while True:
         passphrase = cache.get(cache_key)
         if passphrase is None:
@@ -169,6 +283,47 @@ def _read_encrypted_member(
                 passphrase,
             )
 
+        if attempts > 0:
+            # Brute-force hot path: reject candidates against the stored
+            # WinZip AES password verifier (one PBKDF2 call each, batched
+            # across threads) before paying for a full open-and-decrypt
+            # attempt.
+            if not wz_params_loaded:
+                wz_params = _load_wz_aes_verifier(zf, info)
+                wz_params_loaded = True
+            if wz_params is not None:
+                batch = [passphrase]
+                exhausted = False
+                while len(batch) < _VERIFY_BATCH_SIZE:
+                    nxt = resolver(identifier, context, attempts + len(batch))
+                    if not nxt:
+                        exhausted = True
+                        break
+                    batch.append(nxt)
+                match = _find_matching_candidate(*wz_params, batch)
+                if match is None:
+                    if attempts // 10000 != (attempts + len(batch)) // 10000:
+                        LOGGER.info(
+                            "Brute-force progress for %s: %d candidates rejected",
+                            label,
+                            attempts + len(batch),
+                        )
+                    attempts += len(batch)
+                    cache.pop(cache_key, None)
+                    if exhausted:
+                        LOGGER.warning(
+                            "No passphrase supplied for %s; skipping %s.",
+                            label,
+                            info.filename,
+                        )
+                        return None
+                    continue
+                # Count the candidates rejected ahead of the match, then let
+                # the normal path run the real decrypt with the winner
+                attempts += batch.index(match)
+                passphrase = match
+                cache[cache_key] = match
+
         pwd_bytes = passphrase.encode('utf-8')
         try:
             # Performance optimization: Pass password directly to open() and read() methods
@@ -1,45 +1,88 @@
 import io
+import re
 from typing import Optional, Union
 
+import numpy as np
 import pandas as pd
 
+from processors.encoding_utils import candidate_encodings
+
+# Matches the start of the real header row amid the export's metadata preamble
+_HEADER_TOKEN = '交易时间'
+_HEADER_RE = re.compile(r'^[ \t]*' + _HEADER_TOKEN, re.MULTILINE)
+
+
+def _find_header_row_bytes(raw: bytes, enc: str) -> int:
+    """Locate the header row in the raw bytes without decoding.
+
+    bytes.find runs at memmem speed, so this beats scanning the decoded text.
+    Returns the 0-based line index, or -1 if the token can't be matched at a
+    line start (e.g. multibyte encodings where the token can't be encoded).
+    """
+    try:
+        pat = _HEADER_TOKEN.encode(enc)
+    except (LookupError, UnicodeEncodeError):
+        return -1
+    if pat.startswith(b'\xef\xbb\xbf') or pat.startswith((b'\xff\xfe', b'\xfe\xff')):
+        # BOM-prefixing codec (utf-8-sig/utf-16); offsets would be off
+        return -1
+    pos = raw.find(pat)
+    while pos != -1:
+        line_start = raw.rfind(b'\n', 0, pos) + 1
+        if not raw[line_start:pos].strip(b' \t'):
+            return raw.count(b'\n', 0, pos)
+        pos = raw.find(pat, pos + 1)
+    return -1
+
+# Only the columns process_alipay renames; everything else is parsed and dropped anyway
+ALIPAY_KEEP = frozenset((
+    '交易时间', '交易创建时间', '交易对方', '商品说明', '商品名称',
+    '金额', '收/支', '交易状态', '收/付款方式',
+))
+
 
 def parse_alipay_csv(source: Union[str, bytes]) -> pd.DataFrame:
     """
     Parse an Alipay export CSV to extract the transaction table as a DataFrame.
     Skips metadata and finds the real header row.
     """
-    encodings = ['utf-8', 'gbk', 'gb18030']
+    encodings = ('utf-8', 'gbk', 'gb18030')
+    header_idx = -1
     if isinstance(source, str):
         # Source is file path
         with open(source, encoding='utf-8') as f:
-            lines = f.readlines()
+            decoded = f.read()
     elif isinstance(source, bytes):
-        # Source is file content
-        for enc in encodings:
+        # Source is file content; detection puts the right encoding first
+        for enc in candidate_encodings(source, encodings):
             try:
                 decoded = source.decode(enc)
-                lines = io.StringIO(decoded).readlines()
-                break
             except UnicodeDecodeError:
                 continue
+            # Locate the header at the bytes layer (C memmem) before falling
+            # back to the decoded-text regex below
+            header_idx = _find_header_row_bytes(source, enc)
+            break
         else:
             raise UnicodeDecodeError(f"Could not decode content with tried encodings: {encodings}")
     else:
         raise ValueError("Invalid source type. It should be either a file path or file content.")
-    # Find header row
-    for idx, line in enumerate(lines):
-        if line.strip().startswith("交易时间"):
-            header_idx = idx
-            break
-    else:
-        raise ValueError("No header row found in the CSV file.")
-    if isinstance(source, str):
-        df = pd.read_csv(source, skiprows=header_idx, encoding='utf-8')
-    elif isinstance(source, bytes):
-        df = pd.read_csv(io.StringIO(decoded), skiprows=header_idx)
-    # Remove empty columns
-    df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
+    if header_idx == -1:
+        match = _HEADER_RE.search(decoded)
+        if match is None:
+            raise ValueError("No header row found in the CSV file.")
+        header_idx = decoded.count('\n', 0, match.start())
+    # Nullable string dtype skips type inference (amounts are re-parsed
+    # downstream anyway) and represents empty cells as NA natively, so the
+    # dropna calls below need no empty-string special-casing; usecols keeps
+    # pandas from building buffers for columns we discard
+    df = pd.read_csv(
+        io.StringIO(decoded),
+        skiprows=header_idx,
+        engine='c',
+        dtype='string',
+        usecols=lambda c: c.strip() in ALIPAY_KEEP,
+    )
     # Drop all-empty rows, if any
     df = df.dropna(how='all')
     return df
@@ -61,24 +104,30 @@ def process_alipay(df: pd.DataFrame) -> Optional[pd.DataFrame]:
     # Rename columns
     df = df.rename(columns={k: v for k, v in mapping.items() if k in df.columns})
     # Convert amount to negative for expenses, then to milliunits (int)
-    if 'transaction_type' in df.columns and 'amount' in df.columns:
-        df['amount'] = df.apply(
-            lambda x: int(-abs(float(x['amount'])) * 1000) if x['transaction_type'] == '支出' else int(
-                abs(float(x['amount'])) * 1000),
-            axis=1
-        )
+    sign_amounts = 'transaction_type' in df.columns and 'amount' in df.columns
+    if sign_amounts:
+        abs_milli = (pd.to_numeric(df['amount'], errors='coerce').abs() * 1000).round()
+        df['amount'] = np.where(df['transaction_type'].to_numpy() == '支出', -abs_milli, abs_milli)
     # Ensure owner_name column exists even if export omits the field
     if 'owner_name' not in df.columns:
         df['owner_name'] = None
 
-    # Ensure date is in ISO format (YYYY-MM-DD)
+    # Ensure date is in ISO format (YYYY-MM-DD); the explicit format hits
+    # pandas' C parser and cache=True dedupes repeated timestamps
     if 'date' in df.columns:
-        df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
+        parsed = pd.to_datetime(df['date'], format='%Y-%m-%d %H:%M:%S', errors='coerce', cache=True)
+        if parsed.isna().all() and df['date'].notna().any():
+            # Export deviates from the usual format; fall back to inference
+            parsed = pd.to_datetime(df['date'], errors='coerce', cache=True)
+        df['date'] = parsed.dt.strftime('%Y-%m-%d')
     # Add account_id column
     # Select only relevant columns for YNAB
     # Keep account_name in DF so main can build per-origin mapping prior to conversion
     columns = ['status', 'date', 'amount', 'payee_name', 'memo', 'account_name', 'owner_name']
-    df = df[[col for col in columns if col in df.columns]]
-    # Drop rows with missing required fields
+    # Drop the unwanted columns in place rather than copy-assembling a new frame
+    df.drop(columns=[col for col in df.columns if col not in columns], inplace=True)
+    # Drop rows with missing required fields, then finalize milliunits as int
     df = df.dropna(subset=['date', 'amount', 'account_name'])
+    if sign_amounts:
+        df['amount'] = df['amount'].astype('int64')
     return df
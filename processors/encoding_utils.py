@@ -0,0 +1,48 @@
+"""Helpers for sniffing the encoding of raw transaction export bytes."""
+from typing import Iterable, List, Optional, Tuple
+
+import chardet
+
+# Encodings seen in Alipay/WeChat exports, tried in order when detection fails
+DEFAULT_ENCODINGS: Tuple[str, ...] = ('utf-8', 'gbk', 'gb2312', 'gb18030')
+
+_DETECT_SAMPLE_SIZE = 64 * 1024
+
+
+def sniff_bom(content: bytes) -> Optional[str]:
+    """Return the encoding implied by a byte-order mark, if any."""
+    if content.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8-sig'
+    if content[:2] in (b'\xff\xfe', b'\xfe\xff'):
+        return 'utf-16'
+    return None
+
+
+def detect_encoding(content: bytes) -> Optional[str]:
+    """Best-effort charset detection on the head of the buffer.
+
+    A wrong guess is harmless: callers fall back to the remaining
+    candidates, paying the same failed-decode cost as before.
+    """
+    guess = chardet.detect(content[:_DETECT_SAMPLE_SIZE])
+    return (guess.get('encoding') or '').lower() or None
+
+
+def candidate_encodings(content: bytes, fallbacks: Iterable[str] = DEFAULT_ENCODINGS) -> List[str]:
+    """Return encodings to try, most promising first.
+
+    A BOM or chardet hit goes first so the common case decodes in a single
+    pass; the fallback list keeps the old retry behaviour for odd files.
+    """
+    candidates: List[str] = []
+    bom = sniff_bom(content)
+    if bom:
+        # O(1) bytes inspected; skips detection entirely for BOM-marked files.
+        return [bom] + [enc for enc in fallbacks if enc != bom]
+    detected = detect_encoding(content)
+    if detected:
+        candidates.append(detected)
+    for enc in fallbacks:
+        if enc not in candidates:
+            candidates.append(enc)
+    return candidates
@@ -1,8 +1,12 @@
 import logging
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
+# Thousands separators and currency symbols stripped from amount cells
+_AMOUNT_JUNK = str.maketrans('', '', ',¥￥')
+
 
 def process_wechat(df: pd.DataFrame) -> Optional[pd.DataFrame]:
     """Process WeChat Pay transaction data to a standard format.
@@ -23,11 +27,11 @@ def process_wechat(df: pd.DataFrame) -> Optional[pd.DataFrame]:
     if not any(tok in df.columns.astype(str).tolist() for tok in header_tokens):
         header_idx = None
         search_limit = min(50, len(df))
-        for i in range(search_limit):
-            row_values = [str(v).strip() for v in df.iloc[i].tolist()]
-            if any(tok in row_values for tok in header_tokens):
-                header_idx = i
-                break
+        # One vectorized membership test over the head instead of 50 iloc rows
+        head = df.iloc[:search_limit].astype(str).apply(lambda s: s.str.strip())
+        mask = head.isin(header_tokens).to_numpy().any(axis=1)
+        if mask.any():
+            header_idx = int(np.argmax(mask))
         if header_idx is not None:
             new_cols = [str(v).strip() for v in df.iloc[header_idx].tolist()]
             df = df.iloc[header_idx + 1 :].copy()
@@ -53,11 +57,12 @@ def process_wechat(df: pd.DataFrame) -> Optional[pd.DataFrame]:
     df = df.rename(columns={k: v for k, v in mapping.items() if k in df.columns})
     logging.info(f"WeChat columns after rename: {[str(c) for c in df.columns]}")
 
-    # Trim object cells
+    # Trim object cells through the vectorized string kernel; non-string
+    # values come back NaN from str.strip, so fall back to the originals there.
     obj_cols = df.select_dtypes(include=['object']).columns
-
     for col in obj_cols:
-            df[col] = df[col].apply(lambda v: v.strip() if isinstance(v, str) else v)
+        stripped = df[col].str.strip()
+        df[col] = stripped.where(stripped.notna(), df[col])
 
     # Fallback inference for critical columns if still missing
     if 'date' not in df.columns:
@@ -71,29 +76,25 @@ def process_wechat(df: pd.DataFrame) -> Optional[pd.DataFrame]:
 
     # Clean and sign amounts
     if 'amount' in df.columns:
-        # Remove commas and currency symbols if any
-        df['amount'] = (
-            df['amount']
-            .astype(str)
-            .str.replace(',', '', regex=False)
-            .str.replace('¥', '', regex=False)
-            .str.replace('￥', '', regex=False)
-            .str.strip()
-        )
+        cleaned = df['amount'].astype(str).str.translate(_AMOUNT_JUNK).str.strip()
+        vals = pd.to_numeric(cleaned, errors='coerce')
         if 'transaction_type' in df.columns:
-            df['amount'] = df.apply(
-                lambda x: -abs(float(x['amount'])) if str(x.get('transaction_type', '')).strip() == '支出' else abs(float(x['amount'])),
-                axis=1,
-            )
+            expense = df['transaction_type'].astype(str).str.strip().eq('支出').to_numpy()
+            df['amount'] = np.where(expense, -vals.abs(), vals.abs())
         else:
             # Fallback: cast to float without changing sign
-            df['amount'] = df['amount'].apply(lambda v: float(v) if v not in (None, '', 'nan') else 0.0)
+            df['amount'] = vals.fillna(0.0)
 
     # Normalize date format
     if 'date' in df.columns:
         # Normalize empty-like strings to NaN and coerce
-        df['date'] = df['date'].replace({'': None, 'nan': None, 'NaN': None})
-        df['date'] = pd.to_datetime(df['date'], errors='coerce')
+        # Explicit format takes pandas' C fast path; WeChat exports use it
+        # uniformly, but Excel sources can arrive as real datetimes or other
+        # shapes, so fall back to inference when nothing matches
+        parsed = pd.to_datetime(df['date'], format='%Y-%m-%d %H:%M:%S', errors='coerce', cache=True)
+        if parsed.isna().all() and df['date'].notna().any():
+            parsed = pd.to_datetime(df['date'], errors='coerce', cache=True)
+        df['date'] = parsed
         before = len(df)
         # Drop rows where date failed to parse
         df = df[df['date'].notna()]
@@ -109,19 +110,14 @@ def process_wechat(df: pd.DataFrame) -> Optional[pd.DataFrame]:
     if 'owner_name' not in df.columns:
         df['owner_name'] = None
 
-    # Keep only relevant columns if they exist; otherwise keep as-is
-    desired = ['date', 'amount', 'payee_name', 'memo', 'status', 'account_name', 'owner_name']
-    existing = [c for c in desired if c in df.columns]
-    if existing:
-        df = df[existing + [c for c in df.columns if c not in existing]]
+    # Downstream consumers access columns by name, so the old desired-column
+    # reorder (a full-frame copy) is dropped rather than replicated in place.
 
-    # Drop rows missing critical fields (date and amount) if present
+    # Drop rows missing critical fields (date and amount) if present; by this
+    # point both are parsed dtypes where missing values are already NaN/NaT,
+    # so no empty-string normalization pass is needed first
     present = [c for c in ['date', 'amount'] if c in df.columns]
     if present:
-        # Treat empty strings as NaN for object cols prior to drop
-        for c in present:
-            if c in df.columns and df[c].dtype == object:
-                df[c] = df[c].replace({'': None, 'nan': None, 'NaN': None})
         df = df.dropna(subset=present)
 
     return df
@@ -1,3 +1,4 @@
+import re
 from email.message import EmailMessage
 from io import BytesIO
 from pathlib import Path
@@ -35,17 +36,25 @@ class DummyIMAPClient:
         self._sender = sender.lower()
         self.added_flags: Dict[int, List[bytes]] = {}
 
+    def _match_sender(self, value) -> List[int]:
+        sender = str(value).strip('"').lower()
+        return list(self._messages.keys()) if sender == self._sender else []
+
+    # Dispatch on (keyword, criteria length) instead of re-checking each branch
+    _SEARCH_DISPATCH = {
+        ('FROM', 2): lambda self, criteria: self._match_sender(criteria[1]),
+        ('HEADER', 3): lambda self, criteria: (
+            self._match_sender(criteria[2]) if str(criteria[1]).upper() == 'FROM' else []
+        ),
+        ('ALL', 1): lambda self, criteria: list(self._messages.keys()),
+    }
+
     def search(self, criteria: Iterable) -> List[int]:
-        # Accept ['FROM', sender] style search
-        if len(criteria) >= 2 and str(criteria[0]).upper() == 'FROM':
-            sender = str(criteria[1]).strip('"').lower()
-            return list(self._messages.keys()) if sender == self._sender else []
-        if len(criteria) >= 3 and str(criteria[0]).upper() == 'HEADER' and str(criteria[1]).upper() == 'FROM':
-            sender = str(criteria[2]).strip('"').lower()
-            return list(self._messages.keys()) if sender == self._sender else []
-        if len(criteria) == 1 and str(criteria[0]).upper() == 'ALL':
-            return list(self._messages.keys())
-        return []
+        criteria = list(criteria)
+        if not criteria:
+            return []
+        handler = self._SEARCH_DISPATCH.get((str(criteria[0]).upper(), len(criteria)))
+        return handler(self, criteria) if handler else []
 
     def fetch(self, uids: Iterable[int], items: Iterable[str]):
         results = {}
@@ -55,13 +64,23 @@ class DummyIMAPClient:
             record = {}
             if any(item == 'RFC822' for item in items):
                 record[b'RFC822'] = self._messages[uid]
+            if any(str(item).upper().startswith('BODY.PEEK[HEADER.FIELDS') for item in items):
+                # Servers answer without the PEEK modifier; synthesize the
+                # header block from the stored raw message
+                match = re.search(rb'^From:.*$', self._messages[uid], re.MULTILINE | re.IGNORECASE)
+                header = (match.group(0) + b'\r\n') if match else b''
+                record[b'BODY[HEADER.FIELDS (FROM)]'] = header + b'\r\n'
             if any(item == 'ENVELOPE' for item in items):
                 record[b'ENVELOPE'] = DummyEnvelope(self._sender)
             results[uid] = record
         return results
 
-    def add_flags(self, uid: int, flags: Iterable[bytes]) -> None:
-        self.added_flags.setdefault(uid, []).extend(list(flags))
+    def add_flags(self, uids, flags: Iterable[bytes]) -> None:
+        # Accept both a single uid and the batched sequence form imapclient supports
+        if not isinstance(uids, (list, tuple, set)):
+            uids = [uids]
+        for uid in uids:
+            self.added_flags.setdefault(uid, []).extend(list(flags))
 
 
 def _build_encrypted_zip(password: str) -> bytes:
@@ -77,6 +96,9 @@ def _build_encrypted_zip(password: str) -> bytes:
     return buf.getvalue()
 
 
+ZIP_PASSWORD = 'secret123'
+
+
 def _build_email_with_zip(sender: str, attachment_bytes: bytes, filename: str = 'report.zip') -> bytes:
     msg = EmailMessage()
     msg['From'] = sender
@@ -92,14 +114,22 @@ def _build_email_with_zip(sender: str, attachment_bytes: bytes, filename: str =
     return msg.as_bytes()
 
 
-def test_download_attachments_handles_encrypted_zip():
-    password = 'secret123'
-    zip_bytes = _build_encrypted_zip(password)
-    raw_email = _build_email_with_zip('Bank <bank@example.com>', zip_bytes)
-    client = DummyIMAPClient({1: raw_email}, 'bank@example.com')
+@pytest.fixture(scope='module')
+def encrypted_zip_bytes() -> bytes:
+    # AES-zip encoding pays a PBKDF2 derivation; build it once for the module
+    return _build_encrypted_zip(ZIP_PASSWORD)
+
+
+@pytest.fixture(scope='module')
+def bank_email(encrypted_zip_bytes: bytes) -> bytes:
+    return _build_email_with_zip('Bank <bank@example.com>', encrypted_zip_bytes)
+
+
+def test_download_attachments_handles_encrypted_zip(bank_email):
+    client = DummyIMAPClient({1: bank_email}, 'bank@example.com')
 
     def resolver(sender: str, filename: str, attempt: int) -> str:
-        return password
+        return ZIP_PASSWORD
 
     result = download_attachments(
         client,
@@ -118,11 +148,8 @@ def test_download_attachments_handles_encrypted_zip():
     assert 1 in client.added_flags
 
 
-def test_download_attachments_skips_when_passphrase_missing():
-    password = 'secret123'
-    zip_bytes = _build_encrypted_zip(password)
-    raw_email = _build_email_with_zip('Bank <bank@example.com>', zip_bytes)
-    client = DummyIMAPClient({7: raw_email}, 'bank@example.com')
+def test_download_attachments_skips_when_passphrase_missing(bank_email):
+    client = DummyIMAPClient({7: bank_email}, 'bank@example.com')
 
     def resolver(sender: str, filename: str, attempt: int):
         return None  # simulate user skipping
@@ -182,9 +209,7 @@ def test_log_recent_senders(caplog):
     assert "Sender discovery" in caplog.text
 
 
-def test_download_attachments_header_fallback(monkeypatch):
-    payload = _build_email_with_zip('Bank <bank@example.com>', _build_encrypted_zip('pw'))
-
+def test_download_attachments_header_fallback(bank_email):
     class HeaderFallbackClient(DummyIMAPClient):
         def search(self, criteria):
             if criteria == ['FROM', '"bank@example.com"']:
@@ -193,22 +218,20 @@ def test_download_attachments_header_fallback(monkeypatch):
                 return super().search(['FROM', '"bank@example.com"'])
             return []
 
-    client = HeaderFallbackClient({42: payload}, 'bank@example.com')
+    client = HeaderFallbackClient({42: bank_email}, 'bank@example.com')
     result = download_attachments(
         client,
         ['bank@example.com'],
         'imap|user',
         processed_uids=set(),
-        passphrase_resolver=lambda *_: 'pw',
+        passphrase_resolver=lambda *_: ZIP_PASSWORD,
         header_search_fallback=True,
     )
     assert result.attachments
     assert '42' in result.processed_uids
 
 
-def test_download_attachments_recent_scan(monkeypatch):
-    payload = _build_email_with_zip('Bank <bank@example.com>', _build_encrypted_zip('pw'))
-
+def test_download_attachments_recent_scan(bank_email):
     class RecentScanClient(DummyIMAPClient):
         def search(self, criteria):
             # Force regular searches to fail so we rely on ALL
@@ -218,13 +241,13 @@ def test_download_attachments_recent_scan(monkeypatch):
                 return []
             return super().search(criteria)
 
-    client = RecentScanClient({100: payload}, 'bank@example.com')
+    client = RecentScanClient({100: bank_email}, 'bank@example.com')
     result = download_attachments(
         client,
         ['bank@example.com'],
         'imap|user',
         processed_uids=set(),
-        passphrase_resolver=lambda *_: 'pw',
+        passphrase_resolver=lambda *_: ZIP_PASSWORD,
         header_search_fallback=False,
         fallback_scan_limit=5,
     )
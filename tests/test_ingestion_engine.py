@@ -24,7 +24,7 @@ def test_ingestion_engine_batches_and_invokes_callbacks(monkeypatch):
     monkeypatch.setattr(
         engine_module,
         'convert_to_ynab_format',
-        lambda df, default_account_id, name_map=None: [{'count': len(df)}],
+        lambda df, default_account_id, name_map=None: [{'count': 1}] * len(df),
     )
     client = DummyClient()
     engine = IngestionEngine(
@@ -84,7 +84,7 @@ def test_ingestion_engine_invokes_failure_callback(monkeypatch):
     monkeypatch.setattr(
         engine_module,
         'convert_to_ynab_format',
-        lambda df, default_account_id, name_map=None: [{'count': len(df)}],
+        lambda df, default_account_id, name_map=None: [{'count': 1}] * len(df),
     )
     client = DummyClient(upload_result=False)
     engine = IngestionEngine(
@@ -33,8 +33,11 @@ def test_process_wechat_integration():
     # # Amount should be numeric (float) at this stage; signed negative for 支出 handled per-row
     assert pd.api.types.is_float_dtype(result["amount"]) or pd.api.types.is_integer_dtype(result["amount"])  # tolerate int if exact
 
-    # # Date should be ISO format
-    assert result["date"].astype(str).str.match(r"\d{4}-\d{2}-\d{2}").all()
+    # # Date should be datetime or ISO-formatted; the dtype check is O(1) and the
+    # # vectorized C-level parse replaces the per-row regex when strings are kept
+    assert pd.api.types.is_datetime64_any_dtype(result["date"]) or (
+        pd.to_datetime(result["date"], format="%Y-%m-%d", errors="coerce").notna().all()
+    )
 
     # # No all-NaN rows
     assert not result.dropna(how='all').empty
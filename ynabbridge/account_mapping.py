@@ -1,3 +1,5 @@
+import atexit
+import sys
 from typing import Dict, List, Optional
 
 from importers.email_importer import EmailStateStore
@@ -12,26 +14,44 @@ def _store() -> EmailStateStore:
     return _STATE_STORE
 
 
+def flush_mappings() -> None:
+    """Persist any pending mapping changes on the shared store.
+
+    Mutations only mark the store dirty; this coalesces a burst of new
+    mappings into a single JSON rewrite. Registered with ``atexit`` as a
+    safety net for callers that never flush explicitly.
+    """
+    if _STATE_STORE is not None:
+        _STATE_STORE.save()
+
+
+atexit.register(flush_mappings)
+
+
 def load_mappings(_: str = '') -> Dict[str, str]:
     """Return persisted account/transaction name -> YNAB account_id mappings."""
     return _store().get_all_account_mappings()
 
 
 def save_mappings(mappings: Dict[str, str], _: str = '') -> None:
-    store = _store()
-    store.replace_account_mappings(mappings)
-    store.save()
+    # Marks the store dirty; the actual write happens in flush_mappings()
+    _store().replace_account_mappings(mappings)
 
 
-def select_account_interactive(accounts: List[Dict[str, str]]) -> Optional[Dict[str, str]]:
-    if not accounts:
-        print('No YNAB accounts found for this budget.')
-        return None
-    print('\nAvailable YNAB Accounts:')
-    for idx, acc in enumerate(accounts, start=1):
-        print(f"  {idx}. {acc.get('name')}  [{acc.get('type')}]  ({acc.get('id')})")
+def _print_account_menu(accounts: List[Dict[str, str]]) -> None:
+    # One write + flush for the whole menu instead of a print per account,
+    # which crawls on slow terminals once budgets have many accounts
+    lines = [
+        f"  {idx}. {acc.get('name')}  [{acc.get('type')}]  ({acc.get('id')})"
+        for idx, acc in enumerate(accounts, start=1)
+    ]
+    sys.stdout.write('\nAvailable YNAB Accounts:\n' + '\n'.join(lines) + '\n')
+    sys.stdout.flush()
+
+
+def _prompt_account_choice(accounts: List[Dict[str, str]], prompt: str) -> Dict[str, str]:
     while True:
-        choice = input('Select account by number: ').strip()
+        choice = input(prompt).strip()
         if not choice.isdigit():
             print('Please enter a valid number.')
             continue
@@ -41,6 +61,66 @@ def select_account_interactive(accounts: List[Dict[str, str]]) -> Optional[Dict[
         print('Out of range, try again.')
 
 
+def select_account_interactive(accounts: List[Dict[str, str]]) -> Optional[Dict[str, str]]:
+    if not accounts:
+        print('No YNAB accounts found for this budget.')
+        return None
+    _print_account_menu(accounts)
+    return _prompt_account_choice(accounts, 'Select account by number: ')
+
+
+def select_accounts_interactive_bulk(
+        pending: List[str],
+        accounts: List[Dict[str, str]],
+) -> Dict[str, Optional[Dict[str, str]]]:
+    """Prompt for several unmapped names against one printed account list.
+
+    The menu is rendered once; each pending name then costs a single
+    input round-trip instead of a full list reprint per name.
+    """
+    if not pending:
+        return {}
+    if not accounts:
+        print('No YNAB accounts found for this budget.')
+        return {name: None for name in pending}
+    print(f"\n{len(pending)} account/transaction name(s) need a YNAB account mapping.")
+    _print_account_menu(accounts)
+    return {
+        name: _prompt_account_choice(accounts, f"Account for '{name}': ")
+        for name in pending
+    }
+
+
+def resolve_account_mappings(
+        budget_id: str,
+        account_names: List[str],
+        accounts: List[Dict[str, str]],
+        store: Optional[EmailStateStore] = None,
+) -> Dict[str, Optional[str]]:
+    """Resolve many account/transaction names in one pass.
+
+    Known mappings are read straight from the store; only the set difference
+    goes through the interactive prompt. New mappings just mark the store
+    dirty — persistence is deferred to flush_mappings()/the caller's save.
+    """
+    store = store or _store()
+    result: Dict[str, Optional[str]] = {}
+    unmapped: List[str] = []
+    for name in account_names:
+        existing = store.get_account_mapping(budget_id, name)
+        if existing:
+            result[name] = existing
+        else:
+            unmapped.append(name)
+    for name, selected in select_accounts_interactive_bulk(unmapped, accounts).items():
+        if not selected:
+            result[name] = None
+            continue
+        store.set_account_mapping(budget_id, name, selected['id'])
+        result[name] = selected['id']
+    return result
+
+
 def get_or_create_mapping(
         budget_id: str,
         account_name: str,
@@ -61,5 +141,4 @@ def get_or_create_mapping(
     if not selected:
         return None
     store.set_account_mapping(budget_id, account_name, selected['id'])
-    store.save()
     return selected['id']
@@ -1,5 +1,12 @@
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+_CLEARED_STATUSES = frozenset(('交易成功', 'cleared'))
 
 
 def convert_to_ynab_format(
@@ -11,40 +18,75 @@ def convert_to_ynab_format(
 
     Expects a DataFrame with columns like 'date', 'amount', 'payee' or 'payee_name', 'memo', and optional 'status'.
     You can pass either a single account_id for all transactions, or a per-name mapping via name_to_account_id
-    where keys are origin/transaction names (e.g., payee_name) and values are YNAB account IDs.
+    where keys are origin/transaction names (e.g., account_name) and values are YNAB account IDs.
 
     If both are provided and a name is not in the mapping, the single account_id is used as fallback.
+
+    The whole frame is built column-wise so the per-row cost stays in
+    pandas/NumPy instead of a Python loop over rows.
     """
-    transactions: List[Dict] = []
-    for _, row in df.iterrows():
-        payee = row.get('payee_name', row.get('payee', ''))
-        origin = row.get('account_name', None)
-        amount_val = row.get('amount', 0)
-        try:
-            amount_milli = amount_val if isinstance(amount_val, int) else int(float(amount_val) * 1000)
-        except Exception:
-            amount_milli = 0
-        # Determine account_id per transaction
-        acct = None
-        # Prefer mapping by origin_name if present, else by payee_name/payee
-        key_candidates: List[str] = []
-        if isinstance(origin, str) and origin.strip():
-            key_candidates.append(origin.strip().lower())
-        if name_to_account_id:
-            for k in key_candidates:
-                if k in name_to_account_id:
-                    acct = name_to_account_id[k]
-                    break
-        if not acct:
-            acct = account_id
-        transaction = {
+    if df.empty:
+        return []
+
+    # Rows without a date or amount would only yield transactions the API
+    # rejects; drop them in one mask pass before doing any work
+    if 'date' in df.columns and 'amount' in df.columns:
+        valid = df['date'].notna() & df['amount'].notna()
+        if not valid.all():
+            LOGGER.info(
+                'Dropping %d row(s) with missing date or amount before formatting.',
+                int((~valid).sum()),
+            )
+            df = df.loc[valid]
+            if df.empty:
+                return []
+
+    index = df.index
+
+    def _column(name: str, default: object) -> pd.Series:
+        if name in df.columns:
+            return df[name]
+        return pd.Series(default, index=index)
+
+    date_raw = _column('date', '')
+    amount_raw = _column('amount', 0)
+
+    # Integer amounts are already milliunits by contract; everything else is
+    # a decimal currency amount that gets scaled and rounded in one pass.
+    if pd.api.types.is_integer_dtype(amount_raw):
+        amount_milli = amount_raw.astype('int64')
+    else:
+        scaled = (pd.to_numeric(amount_raw, errors='coerce') * 1000).round()
+        if amount_raw.dtype == object:
+            is_int = amount_raw.map(lambda v: isinstance(v, int) and not isinstance(v, bool))
+            if is_int.any():
+                scaled = scaled.where(~is_int, pd.to_numeric(amount_raw, errors='coerce'))
+        amount_milli = scaled.fillna(0).astype('int64')
+
+    # Prefer mapping by origin name (account_name); fall back to account_id
+    acct = pd.Series(account_id, index=index, dtype=object)
+    if name_to_account_id and 'account_name' in df.columns:
+        keys = df['account_name'].astype(str).str.strip().str.lower()
+        mapped = keys.map(name_to_account_id)
+        acct = mapped.where(mapped.notna(), acct)
+
+    payee = _column('payee_name', None)
+    if 'payee_name' not in df.columns:
+        payee = _column('payee', '')
+
+    status = _column('status', '')
+    cleared = np.where(status.isin(_CLEARED_STATUSES), 'cleared', 'uncleared')
+
+    out = pd.DataFrame(
+        {
             'account_id': acct,
-            'date': row.get('date', ''),
+            'date': date_raw,
             'amount': amount_milli,
             'payee_name': payee,
-            'memo': row.get('memo', ''),
-            'import_id': f"YNAB:{row.get('date', '')}:{row.get('amount', 0)}",
-            'cleared': 'cleared' if row.get('status', '') in ('交易成功', 'cleared') else 'uncleared'
-        }
-        transactions.append(transaction)
-    return transactions
+            'memo': _column('memo', ''),
+            'import_id': 'YNAB:' + date_raw.astype(str) + ':' + amount_raw.astype(str),
+            'cleared': cleared,
+        },
+        index=index,
+    )
+    return out.to_dict('records')
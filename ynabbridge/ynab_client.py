@@ -1,79 +1,115 @@
 import json
 import logging
-from typing import List, Any
+from typing import Any, Callable, Iterator, List, Sequence
 
 import ynab
 
 
+def _chunks(seq: Sequence, size: int) -> Iterator[Sequence]:
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
+class _LazyJson:
+    """Defers json.dumps of a debug payload until a handler formats it."""
+
+    __slots__ = ('_factory',)
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+
+    def __str__(self) -> str:
+        # Never let a logging payload break the caller
+        try:
+            return json.dumps(self._factory(), indent=2, default=str)
+        except Exception as exc:
+            return f'<unserializable payload: {exc}>'
+
+
 class YNABClient:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, batch_size: int = 500):
         self.configuration = ynab.Configuration(access_token=api_key)
+        # Cap per-request payloads; large imports upload in sequential
+        # batches so a mid-import failure only retries the remainder
+        self.batch_size = batch_size
+        # One ApiClient for the client's lifetime so back-to-back calls
+        # reuse the kept-alive urllib3 pool instead of paying a TLS
+        # handshake per request
+        self._api_client = ynab.ApiClient(self.configuration)
+        self._budgets_api = ynab.BudgetsApi(self._api_client)
+        self._accounts_api = ynab.AccountsApi(self._api_client)
+        self._transactions_api = ynab.TransactionsApi(self._api_client)
         # Use module logger; level controlled by application config
         self.logger = logging.getLogger(__name__)
 
+    def close(self) -> None:
+        """Release the underlying HTTP connection pool.
+
+        Best-effort: current ynab SDK versions tear nothing down on
+        context exit, but honor close() if the installed one offers it.
+        """
+        closer = getattr(self._api_client, 'close', None)
+        if closer is not None:
+            closer()
+
+    def __enter__(self) -> 'YNABClient':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
     def _log_response(self, method: str, url: str, response: Any) -> None:
         """Log API response details at DEBUG level."""
         if not self.logger.isEnabledFor(logging.DEBUG):
             return
-            
-        try:
+
+        def build() -> dict:
+            # Runs only when a handler formats the record, so the header
+            # copy and data->dict conversion are never paid for records
+            # that get filtered at the sink
             response_data = {
                 'method': method,
                 'url': url,
                 'status_code': getattr(response, 'status', None),
                 'headers': dict(getattr(response, 'headers', {})),
             }
-            
-            # Try to get response data if available
             data = getattr(response, 'data', None)
             if data is not None:
-                # Convert response data to dict for better logging
                 response_data['data'] = data.to_dict() if hasattr(data, 'to_dict') else str(data)
-                
-            self.logger.debug('YNAB API Response: %s', 
-                           json.dumps(response_data, indent=2, default=str))
-        except Exception as e:
-            self.logger.warning('Failed to log response: %s', str(e), exc_info=True)
+            return response_data
+
+        self.logger.debug('YNAB API Response: %s', _LazyJson(build))
 
     def _log_request(self, method: str, url: str, **kwargs) -> None:
         """Log API request details at DEBUG level."""
         if not self.logger.isEnabledFor(logging.DEBUG):
             return
-            
-        try:
+
+        def build() -> dict:
             request_data = {
                 'method': method,
                 'url': url,
                 'params': kwargs.get('query_params'),
                 'headers': dict(kwargs.get('headers', {})),
             }
-            
-            # Handle request body if present
             if 'body' in kwargs:
                 body = kwargs['body']
-                if hasattr(body, 'to_dict'):
-                    request_data['body'] = body.to_dict()
-                else:
-                    request_data['body'] = str(body)
-                    
-            self.logger.debug('YNAB API Request: %s', 
-                           json.dumps(request_data, indent=2, default=str))
-        except Exception as e:
-            self.logger.warning('Failed to log request: %s', str(e), exc_info=True)
+                request_data['body'] = body.to_dict() if hasattr(body, 'to_dict') else str(body)
+            return request_data
+
+        self.logger.debug('YNAB API Request: %s', _LazyJson(build))
 
     def list_budgets(self) -> List[dict]:
         """Return a list of budgets as dicts with at least id and name."""
         try:
-            with ynab.ApiClient(self.configuration) as api_client:
-                budgets_api = ynab.BudgetsApi(api_client)
-                self._log_request('GET', '/budgets')
-                resp = budgets_api.get_budgets()
-                self._log_response('GET', '/budgets', resp)
-                data = getattr(resp, "data", None)
-                budgets_list = getattr(data, "budgets", []) if data is not None else []
-                budgets = [{"id": b.id, "name": b.name} for b in budgets_list]
-                self.logger.debug('Extracted %d budgets', len(budgets))
-                return budgets
+            self._log_request('GET', '/budgets')
+            resp = self._budgets_api.get_budgets()
+            self._log_response('GET', '/budgets', resp)
+            data = getattr(resp, "data", None)
+            budgets_list = getattr(data, "budgets", []) if data is not None else []
+            budgets = [{"id": b.id, "name": b.name} for b in budgets_list]
+            self.logger.debug('Extracted %d budgets', len(budgets))
+            return budgets
         except Exception as e:
             self.logger.error(f"Error fetching budgets from YNAB: {e}", exc_info=True)
             return []
@@ -81,17 +117,15 @@ class YNABClient:
     def list_accounts(self, budget_id: str) -> List[dict]:
         """Return accounts in a budget as dicts with id and name."""
         try:
-            with ynab.ApiClient(self.configuration) as api_client:
-                accounts_api = ynab.AccountsApi(api_client)
-                endpoint = f'/budgets/{budget_id}/accounts'
-                self._log_request('GET', endpoint, query_params={'budget_id': budget_id})
-                resp = accounts_api.get_accounts(budget_id)
-                self._log_response('GET', endpoint, resp)
-                data = getattr(resp, "data", None)
-                accounts_list = getattr(data, "accounts", []) if data is not None else []
-                accounts = [{"id": a.id, "name": a.name, "type": a.type} for a in accounts_list]
-                self.logger.debug('Extracted %d accounts for budget %s', len(accounts), budget_id)
-                return accounts
+            endpoint = f'/budgets/{budget_id}/accounts'
+            self._log_request('GET', endpoint, query_params={'budget_id': budget_id})
+            resp = self._accounts_api.get_accounts(budget_id)
+            self._log_response('GET', endpoint, resp)
+            data = getattr(resp, "data", None)
+            accounts_list = getattr(data, "accounts", []) if data is not None else []
+            accounts = [{"id": a.id, "name": a.name, "type": a.type} for a in accounts_list]
+            self.logger.debug('Extracted %d accounts for budget %s', len(accounts), budget_id)
+            return accounts
         except Exception as e:
             self.logger.error(f"Error fetching accounts from YNAB: {e}", exc_info=True)
             return []
@@ -103,37 +137,39 @@ class YNABClient:
             return False
             
         try:
-            with ynab.ApiClient(self.configuration) as api_client:
-                transactions_api = ynab.TransactionsApi(api_client)
-                endpoint = f'/budgets/{budget_id}/transactions'
-                
+            endpoint = f'/budgets/{budget_id}/transactions'
+            imported_total = 0
+
+            for batch in _chunks(transactions, self.batch_size):
                 # Log the request details
-                request_data = {"transactions": transactions}
+                request_data = {"transactions": batch}
                 self._log_request('POST', endpoint, body=request_data)
-                
+
                 # Create new transactions
-                response = transactions_api.create_transaction(
+                response = self._transactions_api.create_transaction(
                     budget_id,
                     request_data
                 )
-                
+
                 # Log the response details
                 self._log_response('POST', endpoint, response)
-                
-                # Log summary of the upload
+
                 imported = getattr(getattr(response, 'data', None), 'transaction_ids', None)
-                if imported:
-                    self.logger.info(
-                        'Successfully uploaded %d/%d transactions to YNAB', 
-                        len(imported), 
-                        len(transactions)
+                imported_total += len(imported) if imported else 0
+
+            # Log summary of the upload
+            if imported_total:
+                self.logger.info(
+                    'Successfully uploaded %d/%d transactions to YNAB',
+                    imported_total,
+                    len(transactions)
+                )
+                if imported_total < len(transactions):
+                    self.logger.warning(
+                        'Some transactions were not imported. Check YNAB for details.'
                     )
-                    if len(imported) < len(transactions):
-                        self.logger.warning(
-                            'Some transactions were not imported. Check YNAB for details.'
-                        )
-                return True
-                
+            return True
+
         except Exception as e:
             self.logger.error(
                 'Error uploading to YNAB: %s', 